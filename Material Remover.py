@@ -8,10 +8,74 @@ bl_info = {
     "category": "Material",
 }
 
+import re
+
 import bpy
+from bpy.app.handlers import persistent
 from bpy.props import StringProperty, BoolProperty, EnumProperty
 from bpy.types import Operator, Panel
 
+# Optional: with numba installed, pattern matching over very large
+# material libraries runs in a compiled routine instead of a Python
+# loop. The addon works identically without it.
+try:
+    import numba
+    import numpy as np
+except ImportError:
+    numba = None
+
+# Below this many materials the interpreted filter wins; dispatching to
+# the compiled routine only pays off for generated/procedural libraries.
+_NUMBA_MATCH_THRESHOLD = 4096
+
+if numba is not None:
+    @numba.njit(cache=True)
+    def _match_mask(names, pattern):
+        """Mark rows of a fixed-width byte matrix containing pattern.
+
+        names is an (n, width) uint8 array of NUL-padded name bytes;
+        pattern is a 1D uint8 array. cache=True persists the compiled
+        code so the first invocation per session doesn't pay the full
+        JIT cost.
+        """
+        n, width = names.shape
+        plen = pattern.shape[0]
+        mask = np.zeros(n, dtype=np.bool_)
+        for i in range(n):
+            for start in range(width - plen + 1):
+                found = True
+                for j in range(plen):
+                    if names[i, start + j] != pattern[j]:
+                        found = False
+                        break
+                if found:
+                    mask[i] = True
+                    break
+        return mask
+
+def _find_matching_names(names, pattern):
+    """Return the names that contain pattern as a substring."""
+    pattern_bytes = pattern.encode('utf-8')
+    if numba is not None and len(names) >= _NUMBA_MATCH_THRESHOLD:
+        # Pack the names into one fixed-width byte matrix and let the
+        # compiled matcher scan it; the width is sized to the longest
+        # name so nothing gets truncated. NUL padding cannot produce
+        # false positives because UTF-8 text contains no NUL bytes.
+        encoded = [name.encode('utf-8') for name in names]
+        width = max(len(pattern_bytes), max(len(b) for b in encoded))
+        matrix = np.array(encoded, dtype=f'S{width}').view(np.uint8)
+        matrix = matrix.reshape(len(names), width)
+        pat = np.frombuffer(pattern_bytes, dtype=np.uint8)
+        mask = _match_mask(matrix, pat)
+        return [names[i] for i in np.nonzero(mask)[0]]
+    matcher = re.compile(re.escape(pattern)).search
+    return [name for name in names if matcher(name)]
+
+# Cached poll() result; the UI queries operator availability many times
+# per redraw, so the len() RNA call is only repeated after the depsgraph
+# handler below invalidates the cache.
+_poll_cache = None
+
 class MATERIAL_OT_remove_by_name_pattern(Operator):
     """Remove all materials that include the specified string in their names"""
     bl_idname = "material.remove_by_name_pattern"
@@ -37,49 +101,55 @@ class MATERIAL_OT_remove_by_name_pattern(Operator):
     
     @classmethod
     def poll(cls, context):
-        return len(bpy.data.materials) > 0
-    
-    def clean_material_slots(self, material):
-        """Remove material from all objects that use it"""
-        # For each object in the scene
-        for obj in bpy.data.objects:
-            if obj.type == 'MESH' and hasattr(obj, 'material_slots'):
-                if self.cleanup_method == 'NONE':
-                    continue
-                
-                # We need to work from the end to start for removal
-                # to avoid index shifting problems
-                slots_to_process = []
-                
-                # First identify slots with the material
-                for slot_index, slot in enumerate(obj.material_slots):
-                    if slot.material == material:
-                        slots_to_process.append(slot_index)
-                
-                # Process them in reverse order (important for REMOVE method)
-                for slot_index in reversed(slots_to_process):
-                    if self.cleanup_method == 'CLEAR':
-                        obj.data.materials[slot_index] = None
-                    elif self.cleanup_method == 'REMOVE':
-                        # We need to set context object for this operation
-                        old_active = bpy.context.view_layer.objects.active
-                        bpy.context.view_layer.objects.active = obj
-                        
-                        # Make sure we're in object mode
-                        old_mode = obj.mode
-                        bpy.ops.object.mode_set(mode='OBJECT')
-                        
-                        # Select the slot we want to remove
-                        obj.active_material_index = slot_index
-                        
-                        # Remove the slot
-                        bpy.ops.object.material_slot_remove()
-                        
-                        # Restore previous state
-                        if old_mode != 'OBJECT':
-                            bpy.ops.object.mode_set(mode=old_mode)
-                        bpy.context.view_layer.objects.active = old_active
+        global _poll_cache
+        if _poll_cache is None:
+            _poll_cache = len(bpy.data.materials) > 0
+        return _poll_cache
     
+    def clean_material_slots(self, materials_to_remove, mesh_objects):
+        """Remove the given materials from all objects that use them"""
+        if self.cleanup_method == 'NONE':
+            return
+
+        # Index which slots reference a doomed material in a single pass
+        # over the mesh objects, instead of re-walking every object once
+        # per material to remove. Membership is tested on id() so each
+        # slot costs one hash probe rather than an RNA-level equality
+        # check.
+        target_ids = frozenset(id(mat) for mat in materials_to_remove)
+        # Key the hits by the mesh datablock, not the object: both
+        # CLEAR and REMOVE mutate mesh state, and linked duplicates
+        # share one mesh, so applying per object would replay the same
+        # mutation (popping stale indices on the second object). Each
+        # mesh is indexed and processed exactly once.
+        hits = {}
+        seen = set()
+        for obj in mesh_objects:
+            mesh = obj.data
+            if id(mesh) in seen:
+                continue
+            seen.add(id(mesh))
+            slots = obj.material_slots
+            for slot_index, slot in enumerate(slots):
+                if slot.material is not None and id(slot.material) in target_ids:
+                    hits.setdefault(mesh, []).append(slot_index)
+
+        for mesh, slot_indices in hits.items():
+            mesh_materials = mesh.materials
+            # Process them in reverse order (important for REMOVE method)
+            # to avoid index shifting problems
+            for slot_index in reversed(slot_indices):
+                if self.cleanup_method == 'CLEAR':
+                    mesh_materials[slot_index] = None
+                elif self.cleanup_method == 'REMOVE':
+                    # Pop the slot through the data API directly; unlike
+                    # bpy.ops.object.material_slot_remove this needs no
+                    # active object, no mode switch and no per-slot
+                    # undo/depsgraph push. The mesh-keyed index above
+                    # guarantees this runs once per mesh even when
+                    # several objects link the same mesh.
+                    mesh_materials.pop(index=slot_index)
+
     def execute(self, context):
         pattern = self.pattern.strip()
         
@@ -87,8 +157,43 @@ class MATERIAL_OT_remove_by_name_pattern(Operator):
             self.report({'ERROR'}, "Please enter a search pattern")
             return {'CANCELLED'}
         
-        # Find materials with names containing the pattern
-        materials_to_remove = [mat for mat in bpy.data.materials if pattern in mat.name]
+        # Find materials with names containing the pattern.
+        # Compile the pattern once and bind the C-level search to a local
+        # so the per-material test is a single call instead of a fresh
+        # substring scan setup on every iteration.
+        # Hoist the bpy.data collections into locals so the loops below
+        # don't re-resolve the RNA attribute chain on every access.
+        materials = bpy.data.materials
+        # Pull all names across the RNA boundary in one .keys() call and
+        # filter plain Python strings, instead of reading .name on every
+        # material wrapper; only the matches are then looked up by name.
+        all_names = materials.keys()
+        matching_names = _find_matching_names(all_names, pattern)
+        libraries = bpy.data.libraries
+        if not libraries:
+            # Without linked libraries names are unique and the name
+            # index resolves each match directly.
+            materials_to_remove = [materials[name] for name in matching_names]
+        else:
+            # keys() repeats a name when a local and a library-linked
+            # material share it, and materials[name] always resolves to
+            # the local one. Resolve ambiguous names through the
+            # (name, library_filepath) key form so every matched
+            # datablock is found, then dedupe before batch removal.
+            name_counts = {}
+            for name in all_names:
+                name_counts[name] = name_counts.get(name, 0) + 1
+            library_keys = [None] + [lib.filepath for lib in libraries]
+            materials_to_remove = []
+            for name in matching_names:
+                if name_counts[name] == 1:
+                    materials_to_remove.append(materials[name])
+                else:
+                    for lib_path in library_keys:
+                        mat = materials.get((name, lib_path))
+                        if mat is not None:
+                            materials_to_remove.append(mat)
+            materials_to_remove = list(dict.fromkeys(materials_to_remove))
         
         if not materials_to_remove:
             self.report({'INFO'}, f"No materials found containing '{pattern}'")
@@ -97,13 +202,15 @@ class MATERIAL_OT_remove_by_name_pattern(Operator):
         # Count how many materials will be removed
         count = len(materials_to_remove)
         
-        # First clean material references from objects
-        for mat in materials_to_remove:
-            self.clean_material_slots(mat)
+        # First clean material references from objects; only mesh
+        # objects carry material slots, so filter the scene once here.
+        mesh_objects = [obj for obj in bpy.data.objects if obj.type == 'MESH']
+        self.clean_material_slots(materials_to_remove, mesh_objects)
         
-        # Then remove the materials
-        for mat in materials_to_remove:
-            bpy.data.materials.remove(mat)
+        # Then remove the materials in one bulk unlink + free pass,
+        # rather than paying a depsgraph tag and user recount per call
+        # to materials.remove.
+        bpy.data.batch_remove(ids=materials_to_remove)
         
         # Report success
         self.report({'INFO'}, f"Removed {count} material(s) containing '{pattern}'")
@@ -124,28 +231,43 @@ class MATERIAL_PT_remove_panel(Panel):
     bl_space_type = 'VIEW_3D'
     bl_region_type = 'UI'
     bl_category = "Material"
-    
+
+    # Cached (name, users) tuples; panels redraw on every viewport event,
+    # so the material list is only rebuilt when the depsgraph handler
+    # below invalidates it.
+    _material_cache = None
+
     def draw(self, context):
         layout = self.layout
-        
-        # Display count of materials
-        mat_count = len(bpy.data.materials)
+
+        # Display count of materials (resolve bpy.data.materials once)
+        mats = bpy.data.materials
+        mat_count = len(mats)
         layout.label(text=f"Materials in scene: {mat_count}")
-        
+
         # Show list of materials if there are not too many
         if mat_count <= 20:  # Only show list if there aren't too many materials
+            cache = MATERIAL_PT_remove_panel._material_cache
+            if cache is None:
+                cache = [(mat.name, mat.users) for mat in mats]
+                MATERIAL_PT_remove_panel._material_cache = cache
+
             layout.label(text="Materials:")
             box = layout.box()
             col = box.column()
-            for mat in bpy.data.materials:
-                row = col.row()
-                row.label(text=mat.name)
+            for name, users in cache:
                 # Show user count (how many objects use this material)
-                row.label(text=f"Used: {mat.users}")
-        
+                col.label(text=f"{name}  (Used: {users})")
+
         # Operator button
         layout.operator("material.remove_by_name_pattern")
 
+@persistent
+def _invalidate_material_cache(scene, depsgraph):
+    global _poll_cache
+    MATERIAL_PT_remove_panel._material_cache = None
+    _poll_cache = None
+
 classes = (
     MATERIAL_OT_remove_by_name_pattern,
     MATERIAL_PT_remove_panel,
@@ -154,8 +276,11 @@ classes = (
 def register():
     for cls in classes:
         bpy.utils.register_class(cls)
+    bpy.app.handlers.depsgraph_update_post.append(_invalidate_material_cache)
 
 def unregister():
+    if _invalidate_material_cache in bpy.app.handlers.depsgraph_update_post:
+        bpy.app.handlers.depsgraph_update_post.remove(_invalidate_material_cache)
     for cls in classes:
         bpy.utils.unregister_class(cls)
 